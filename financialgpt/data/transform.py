@@ -1,6 +1,38 @@
+from concurrent.futures import ProcessPoolExecutor
+import multiprocessing
+import os
+import sys
 import numpy as np
 import pandas as pd
-from pandas import DataFrame
+from pandas import DataFrame, Series
+
+REFERENCE_COLUMNS = [
+    "Name",
+    "Sector",
+    "P/E Ratio",
+    "Dividend Yield",
+    "52-Week High",
+    "52-Week Low",
+    "Analyst Rating",
+    "Target Price",
+    "Risk Level",
+]
+
+ASSET_PERFORMANCE_COLUMNS = [
+    "Symbol",
+    "Name",
+    "Sector",
+    "Current Price",
+    "Dividend Yield",
+    "P/E Ratio",
+    "52-Week High",
+    "52-Week Low",
+    "Analyst Rating",
+    "Target Price",
+    "Risk Level",
+]
+
+_WORKER_CLIENT_ALLOCATION: DataFrame | None = None
 
 
 def normalize_target_allocation(
@@ -49,12 +81,17 @@ def normalize_target_allocation(
 
 def normalize_client_allocation(
     client_allocation: DataFrame,
+    processes: int = 1,
 ) -> tuple[DataFrame, DataFrame]:
     """
     Normalize the client allocation DataFrame.
 
+    When more than one process is requested and there are several clients, the rows are
+    sharded by client across a process pool. The output is the same as the serial path.
+
     Args:
         client_allocation (DataFrame): The client allocation DataFrame.
+        processes (int): The number of worker processes.
 
     Returns:
         tuple[DataFrame, DataFrame]: A tuple containing the normalized client allocation and
@@ -62,11 +99,20 @@ def normalize_client_allocation(
     """
 
     client_allocation = fix_client_ids(client_allocation)
-    client_allocation = remove_duplicates(client_allocation)
-    client_allocation = fill_na_values(client_allocation)
 
-    asset_performance = get_asset_performance(client_allocation)
-    client_allocation = get_client_allocation(client_allocation)
+    shard_positions = []
+    if processes > 1:
+        shard_positions = get_client_shards(client_allocation, processes)
+
+    if len(shard_positions) > 1:
+        client_allocation, asset_performance = split_client_allocation_parallel(
+            client_allocation, shard_positions
+        )
+    else:
+        client_allocation = remove_duplicates(client_allocation)
+        client_allocation = fill_na_values(client_allocation)
+        asset_performance = get_asset_performance(client_allocation)
+        client_allocation = get_client_allocation(client_allocation)
 
     asset_performance = normalize_column_names(asset_performance)
     client_allocation = normalize_column_names(client_allocation)
@@ -74,27 +120,50 @@ def normalize_client_allocation(
     return client_allocation, asset_performance
 
 
+def get_transform_processes() -> int:
+    """
+    Get the number of processes used to normalize the client allocation.
+
+    It is read from the 'TRANSFORM_PROCESSES' environment variable, where 'auto' uses all
+    the available cores. When it is not set, the transform runs serially.
+
+    Returns:
+        int: The number of processes.
+    """
+    processes = os.getenv("TRANSFORM_PROCESSES", "1").strip().lower()
+    if processes == "auto":
+        return os.cpu_count() or 1
+    return max(int(processes), 1)
+
+
 def fix_client_ids(client_allocation: DataFrame) -> DataFrame:
     """
     Fix misspelled client IDs by ensuring they follow the format 'Client_<numeric_id>'.
 
+    Each distinct ID is fixed only once, since books have far fewer clients than rows.
+
     Args:
         client_allocation (DataFrame): The client allocation DataFrame.
 
     Returns:
         DataFrame: The DataFrame with corrected client IDs.
     """
-    client_allocation["Client"] = client_allocation["Client"].apply(
-        lambda x: f"Client_{''.join([c for c in x if c.isnumeric()])}"
-    )
+    codes, client_ids = pd.factorize(client_allocation["Client"])
+    fixed_ids = [
+        f"Client_{''.join([c for c in x if c.isnumeric()])}" for x in client_ids
+    ]
+    id_lengths = np.append([len(x) for x in fixed_ids], 0)[codes]
+    client_allocation["Client"] = np.append(np.array(fixed_ids, dtype=object), np.nan)[
+        codes
+    ]
     wrongly_filled_ids = (
         (client_allocation.index > 135)
         & (client_allocation.index < 747)
-        & (client_allocation.Client.apply(len) == 8)
+        & (id_lengths == 8)
     )
-    client_allocation.loc[wrongly_filled_ids, "Client"] = client_allocation.shift(
-        -1
-    ).loc[wrongly_filled_ids, "Client"]
+    client_allocation.loc[wrongly_filled_ids, "Client"] = client_allocation[
+        "Client"
+    ].shift(-1)[wrongly_filled_ids]
     return client_allocation
 
 
@@ -111,35 +180,31 @@ def remove_duplicates(client_allocation: DataFrame) -> DataFrame:
     return client_allocation.drop_duplicates(subset=["Client", "Symbol"])
 
 
-def fill_na_values(client_allocation: DataFrame) -> DataFrame:
+def fill_na_values(
+    client_allocation: DataFrame,
+    reference_maps: dict[str, dict] | None = None,
+) -> DataFrame:
     """
     Fill NA values in various columns of the client allocation DataFrame.
 
     Args:
         client_allocation (DataFrame): The client allocation DataFrame.
+        reference_maps (dict[str, dict], optional): The reference maps used to fill each column.
+            When not given, they are built from the client allocation DataFrame.
 
     Returns:
         DataFrame: The DataFrame with NA values filled.
     """
+    if reference_maps is None:
+        reference_maps = build_reference_maps(client_allocation)
 
     client_allocation.loc[:, "Symbol"] = fill_na_with_reference(
-        client_allocation, "Symbol", "Name"
+        client_allocation, "Symbol", "Name", reference_maps["Symbol"]
     )
 
-    columns_to_replace = [
-        "Name",
-        "Sector",
-        "P/E Ratio",
-        "Dividend Yield",
-        "52-Week High",
-        "52-Week Low",
-        "Analyst Rating",
-        "Target Price",
-        "Risk Level",
-    ]
-    for column_to_fix in columns_to_replace:
+    for column_to_fix in REFERENCE_COLUMNS:
         client_allocation.loc[:, column_to_fix] = fill_na_with_reference(
-            client_allocation, column_to_fix, "Symbol"
+            client_allocation, column_to_fix, "Symbol", reference_maps[column_to_fix]
         )
 
     client_allocation.loc[:, "Quantity"] = client_allocation["Quantity"].fillna(
@@ -155,16 +220,314 @@ def fill_na_values(client_allocation: DataFrame) -> DataFrame:
         client_allocation["Buy Price"].replace({np.nan: None}).astype(float)
     )
 
-    client_allocation.loc[:, "Purchase Date"] = pd.to_datetime(
-        client_allocation["Purchase Date"].replace({np.nan: None}), format="%m/%d/%y"
-    ).dt.date
+    client_allocation.loc[:, "Purchase Date"] = parse_dates(
+        client_allocation["Purchase Date"], "%m/%d/%y"
+    )
     return client_allocation
 
 
+def parse_dates(dates: Series, date_format: str) -> np.ndarray:
+    """
+    Parse a column of date strings, parsing each distinct value only once.
+
+    Rows with the same value share the same date object, which also keeps the column
+    cheap to send between processes.
+
+    Args:
+        dates (Series): The date strings.
+        date_format (str): The format of the date strings.
+
+    Returns:
+        np.ndarray: The parsed dates, with NaT for the missing values.
+    """
+    codes, uniques = pd.factorize(dates)
+    parsed = pd.to_datetime(Series(uniques), format=date_format).dt.date.to_numpy()
+    return np.append(parsed, pd.NaT)[codes]
+
+
+def split_client_allocation_parallel(
+    client_allocation: DataFrame, shard_positions: list[np.ndarray]
+) -> tuple[DataFrame, DataFrame]:
+    """
+    Remove duplicates, fill NA values and split the client allocation using a process pool.
+
+    Each worker first removes the duplicates of its shard and extracts its reference pairs,
+    which are merged into the reference maps, and then fills the rows it kept with those
+    maps. Workers return the client allocation rows of their shard without the 'Client'
+    column, and the first row of each symbol as asset performance candidates, which are
+    reduced in the original row order.
+
+    The DataFrame is sent once to each worker when the pool starts. On Linux the workers
+    are forked and inherit it for free, on other platforms it is pickled once per worker.
+
+    Args:
+        client_allocation (DataFrame): The client allocation DataFrame with fixed client IDs.
+        shard_positions (list[np.ndarray]): The row positions of each shard.
+
+    Returns:
+        tuple[DataFrame, DataFrame]: A tuple containing the client allocation and asset
+                                        performance DataFrames, before normalizing the
+                                        column names.
+    """
+    context = None
+    if sys.platform == "linux":
+        context = multiprocessing.get_context("fork")
+
+    with ProcessPoolExecutor(
+        max_workers=len(shard_positions),
+        mp_context=context,
+        initializer=_init_worker,
+        initargs=(client_allocation,),
+    ) as executor:
+        kept_positions, shard_pairs = zip(
+            *executor.map(_get_reference_pairs_shard, shard_positions)
+        )
+        reference_maps = merge_reference_pairs(list(shard_pairs))
+        shard_splits = list(
+            executor.map(
+                _split_shard,
+                kept_positions,
+                [reference_maps] * len(kept_positions),
+            )
+        )
+
+    shard_allocations, shard_assets = zip(*shard_splits)
+
+    allocation = pd.concat(shard_allocations).sort_index()
+    positions = allocation.index.to_numpy()
+    allocation.insert(0, "Client", client_allocation["Client"].to_numpy()[positions])
+    allocation.index = client_allocation.index[positions]
+
+    asset_performance = get_asset_performance(pd.concat(shard_assets).sort_index())
+    asset_performance.index = client_allocation.index[
+        asset_performance.index.to_numpy()
+    ]
+    return allocation, asset_performance
+
+
+def get_client_shards(client_allocation: DataFrame, shards: int) -> list[np.ndarray]:
+    """
+    Split the row positions of the client allocation DataFrame into shards by client.
+
+    All the rows of a client are in the same shard, and shards without rows are dropped.
+
+    Args:
+        client_allocation (DataFrame): The client allocation DataFrame.
+        shards (int): The maximum number of shards.
+
+    Returns:
+        list[np.ndarray]: The row positions of each shard, in ascending order.
+    """
+    positions = np.arange(len(client_allocation))
+    shard_ids = client_allocation["Client"].factorize()[0] % shards
+    shard_positions = [positions[shard_ids == i] for i in range(shards)]
+    return [p for p in shard_positions if len(p) > 0]
+
+
+def _init_worker(client_allocation: DataFrame) -> None:
+    """
+    Store the client allocation DataFrame in the worker process.
+
+    Args:
+        client_allocation (DataFrame): The client allocation DataFrame.
+    """
+    global _WORKER_CLIENT_ALLOCATION
+    _WORKER_CLIENT_ALLOCATION = client_allocation
+
+
+def _get_reference_pairs_shard(
+    positions: np.ndarray,
+) -> tuple[np.ndarray, dict[str, DataFrame]]:
+    """
+    Remove the duplicates of a shard and extract its reference pairs inside a worker process.
+
+    Args:
+        positions (np.ndarray): The row positions of the shard.
+
+    Returns:
+        tuple[np.ndarray, dict[str, DataFrame]]: The row positions kept after removing the
+                                                    duplicates, and the reference pairs of
+                                                    the shard.
+    """
+    columns = _WORKER_CLIENT_ALLOCATION.columns.get_indexer(
+        ["Client", "Symbol", *REFERENCE_COLUMNS]
+    )
+    shard = _WORKER_CLIENT_ALLOCATION.iloc[positions, columns]
+    shard.index = positions
+    shard = remove_duplicates(shard)
+    return shard.index.to_numpy(), get_reference_pairs(shard)
+
+
+def _split_shard(
+    positions: np.ndarray, reference_maps: dict[str, dict]
+) -> tuple[DataFrame, DataFrame]:
+    """
+    Fill NA values in a shard without duplicates and split it inside a worker process.
+
+    Args:
+        positions (np.ndarray): The row positions of the shard kept after removing the
+            duplicates.
+        reference_maps (dict[str, dict]): The reference maps used to fill each column.
+
+    Returns:
+        tuple[DataFrame, DataFrame]: The client allocation rows without the 'Client' column,
+                                        and the first row of each symbol, indexed by row
+                                        position.
+    """
+    shard = _WORKER_CLIENT_ALLOCATION.iloc[positions]
+    shard.index = positions
+    shard = fill_na_values(shard, reference_maps)
+    return (
+        get_client_allocation(shard).drop(columns="Client"),
+        shard[ASSET_PERFORMANCE_COLUMNS].drop_duplicates(subset=["Symbol"]),
+    )
+
+
+def build_reference_maps(client_allocation: DataFrame) -> dict[str, dict]:
+    """
+    Build the maps used to fill NA values, keyed by the column they fill.
+
+    Args:
+        client_allocation (DataFrame): The client allocation DataFrame.
+
+    Returns:
+        dict[str, dict]: The reference maps for each column to fill.
+    """
+    return merge_reference_pairs([get_reference_pairs(client_allocation)])
+
+
+def get_reference_pairs(client_allocation: DataFrame) -> dict[str, DataFrame]:
+    """
+    Extract the distinct pairs of values needed to build the reference maps.
+
+    The 'Symbol' pairs are taken from the 'Name' column. The pairs of the other columns are
+    taken from the 'Symbol' column, or from the 'Name' column for the rows without a symbol,
+    because those rows are only mapped once the 'Symbol' map is known.
+
+    Args:
+        client_allocation (DataFrame): The client allocation DataFrame, or a shard of it.
+
+    Returns:
+        dict[str, DataFrame]: The distinct pairs, keyed by the column they fill, and by the
+            column followed by 'Name' for the rows without a symbol.
+    """
+    distinct = client_allocation[["Symbol", *REFERENCE_COLUMNS]].drop_duplicates()
+    has_symbol = distinct["Symbol"].notna()
+    with_symbol = distinct[has_symbol]
+    without_symbol = distinct.loc[~has_symbol, REFERENCE_COLUMNS].assign(
+        **{"Reference Name": distinct.loc[~has_symbol, "Name"]}
+    )
+
+    pairs = {"Symbol": get_distinct_pairs(distinct, "Symbol", "Name")}
+    for column_to_fix in REFERENCE_COLUMNS:
+        pairs[column_to_fix] = get_distinct_pairs(with_symbol, column_to_fix, "Symbol")
+        pairs[f"{column_to_fix}/Name"] = get_distinct_pairs(
+            without_symbol, column_to_fix, "Reference Name"
+        )
+    return pairs
+
+
+def merge_reference_pairs(shard_pairs: list[dict[str, DataFrame]]) -> dict[str, dict]:
+    """
+    Merge the reference pairs of several shards into the reference maps.
+
+    Args:
+        shard_pairs (list[dict[str, DataFrame]]): The reference pairs of each shard.
+
+    Returns:
+        dict[str, dict]: The reference maps for each column to fill.
+    """
+    symbol_pairs = pd.concat([pairs["Symbol"] for pairs in shard_pairs])
+    reference_maps = {"Symbol": get_map_from_pairs(symbol_pairs, "Symbol", "Name")}
+
+    for column_to_fix in REFERENCE_COLUMNS:
+        name_pairs = pd.concat(
+            [pairs[f"{column_to_fix}/Name"] for pairs in shard_pairs]
+        )
+        name_pairs = name_pairs.assign(
+            Symbol=name_pairs["Reference Name"].map(reference_maps["Symbol"])
+        )
+        column_pairs = pd.concat(
+            [pairs[column_to_fix] for pairs in shard_pairs]
+            + [name_pairs[[column_to_fix, "Symbol"]].dropna()]
+        )
+        reference_maps[column_to_fix] = get_map_from_pairs(
+            column_pairs, column_to_fix, "Symbol"
+        )
+    return reference_maps
+
+
+def get_distinct_pairs(
+    df: DataFrame,
+    column_to_replace: str,
+    column_reference: str,
+) -> DataFrame:
+    """
+    Get the distinct pairs of non-NA values of two columns.
+
+    Args:
+        df (DataFrame): The DataFrame containing reference data for mapping.
+        column_to_replace (str): The column in which to fill NA values.
+        column_reference (str): The reference column to use for mapping.
+
+    Returns:
+        DataFrame: The distinct pairs of values.
+    """
+    return df[[column_to_replace, column_reference]].dropna().drop_duplicates()
+
+
+def get_map_from_pairs(
+    pairs: DataFrame,
+    column_to_replace: str,
+    column_reference: str,
+) -> dict:
+    """
+    Build a map from the reference values to the replacement values of the given pairs.
+
+    When a reference value has several replacement values, the greatest one is kept.
+
+    Args:
+        pairs (DataFrame): The pairs of values.
+        column_to_replace (str): The column in which to fill NA values.
+        column_reference (str): The reference column to use for mapping.
+
+    Returns:
+        dict: The map from reference values to replacement values.
+    """
+    pairs = pairs.drop_duplicates().sort_values(
+        by=[column_to_replace, column_reference]
+    )
+    return dict(zip(pairs[column_reference], pairs[column_to_replace]))
+
+
+def get_reference_map(
+    df: DataFrame,
+    column_to_replace: str,
+    column_reference: str,
+) -> dict:
+    """
+    Build a map from the reference column values to the values of the column to replace.
+
+    Args:
+        df (DataFrame): The DataFrame containing reference data for mapping.
+        column_to_replace (str): The column in which to fill NA values.
+        column_reference (str): The reference column to use for mapping.
+
+    Returns:
+        dict: The map from reference values to replacement values.
+    """
+    return get_map_from_pairs(
+        get_distinct_pairs(df, column_to_replace, column_reference),
+        column_to_replace,
+        column_reference,
+    )
+
+
 def fill_na_with_reference(
     df: DataFrame,
     column_to_replace: str,
     column_reference: str,
+    replacements: dict | None = None,
 ) -> DataFrame:
     """
     Fill NA values in a specified column using a reference column for mapping.
@@ -173,13 +536,14 @@ def fill_na_with_reference(
         df (DataFrame): The DataFrame to update.
         column_to_replace (str): The column in which to fill NA values.
         column_reference (str): The reference column to use for mapping.
-        reference_df (DataFrame): The DataFrame containing reference data for mapping.
+        replacements (dict, optional): The map from reference values to replacement values.
+            When not given, it is built from the DataFrame.
 
     Returns:
         DataFrame: The DataFrame with NA values filled.
     """
-    multi_index = df.groupby(by=[column_to_replace, column_reference]).count().index
-    replacements = {name: symbol for symbol, name in multi_index}
+    if replacements is None:
+        replacements = get_reference_map(df, column_to_replace, column_reference)
     return df[column_to_replace].fillna(df[column_reference].map(replacements))
 
 
@@ -194,22 +558,7 @@ def get_asset_performance(client_allocation: DataFrame) -> DataFrame:
         DataFrame: A DataFrame containing asset performance information.
     """
     asset_performance = (
-        client_allocation.loc[
-            :,
-            [
-                "Symbol",
-                "Name",
-                "Sector",
-                "Current Price",
-                "Dividend Yield",
-                "P/E Ratio",
-                "52-Week High",
-                "52-Week Low",
-                "Analyst Rating",
-                "Target Price",
-                "Risk Level",
-            ],
-        ]
+        client_allocation.loc[:, ASSET_PERFORMANCE_COLUMNS]
         .drop_duplicates(subset=["Symbol"])
         .drop_duplicates(subset=["Name"])
     )
@@ -259,7 +608,7 @@ if __name__ == "__main__":
     target_allocation = pd.read_csv("data/01_raw/financial_advisor_clients.csv")
 
     client_allocation, asset_performance = normalize_client_allocation(
-        client_allocation
+        client_allocation, processes=get_transform_processes()
     )
     target_allocation, client_profile = normalize_target_allocation(target_allocation)
 
@@ -0,0 +1,82 @@
+from financialgpt.data.transform import (
+    fix_client_ids,
+    remove_duplicates,
+    fill_na_values,
+    get_asset_performance,
+    get_client_allocation,
+    normalize_client_allocation,
+)
+from time import perf_counter
+import argparse
+import os
+import pandas as pd
+
+
+def build_book(rows: int) -> pd.DataFrame:
+    """
+    Build a large client allocation DataFrame by repeating the raw sample with new clients.
+
+    Args:
+        rows (int): The approximate number of rows.
+
+    Returns:
+        pd.DataFrame: The client allocation DataFrame.
+    """
+    raw = pd.read_csv("data/01_raw/financial_advisor_clients.csv")
+    raw = fix_client_ids(raw)
+    client_number = raw["Client"].str.removeprefix("Client_").astype(int)
+
+    copies = []
+    for i in range(max(rows // len(raw), 1)):
+        copies.append(
+            raw.assign(Client="Client_" + (client_number + i * 1000).astype(str))
+        )
+    return pd.concat(copies, ignore_index=True)
+
+
+def time_stages(book: pd.DataFrame) -> None:
+    """
+    Print the time of each stage of the serial client allocation normalization.
+
+    Args:
+        book (pd.DataFrame): The client allocation DataFrame.
+    """
+    stages = [
+        ("fix_client_ids", fix_client_ids),
+        ("remove_duplicates", remove_duplicates),
+        ("fill_na_values", fill_na_values),
+    ]
+    client_allocation = book.copy()
+    for name, stage in stages:
+        start = perf_counter()
+        client_allocation = stage(client_allocation)
+        print(f"  {name}: {perf_counter() - start:.2f}s")
+
+    start = perf_counter()
+    get_asset_performance(client_allocation)
+    get_client_allocation(client_allocation)
+    print(f"  split: {perf_counter() - start:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Benchmark the client allocation normalization."
+    )
+    parser.add_argument("--rows", type=int, default=1_500_000)
+    parser.add_argument("--processes", type=int, nargs="+", default=[2, 4, 8])
+    args = parser.parse_args()
+
+    book = build_book(args.rows)
+    print(f"{len(book)} rows, {os.cpu_count()} cores")
+    time_stages(book)
+
+    start = perf_counter()
+    normalize_client_allocation(book.copy())
+    serial = perf_counter() - start
+    print(f"serial: {serial:.2f}s")
+
+    for processes in args.processes:
+        start = perf_counter()
+        normalize_client_allocation(book.copy(), processes=processes)
+        elapsed = perf_counter() - start
+        print(f"{processes} processes: {elapsed:.2f}s ({serial / elapsed:.2f}x)")
@@ -1,7 +1,9 @@
+from financialgpt.data.connection import get_engine, get_pool_metrics
 from financialgpt.data.load import load_data, delete_existing_data
 from financialgpt.data.transform import (
     normalize_target_allocation,
     normalize_client_allocation,
+    get_transform_processes,
 )
 from financialgpt.entity import (
     ClientAllocation,
@@ -11,15 +13,20 @@ from financialgpt.entity import (
 )
 import pandas as pd
 
-target_allocation = pd.read_csv("data/01_raw/client_target_allocations.csv")
-client_allocation = pd.read_csv("data/01_raw/financial_advisor_clients.csv")
+if __name__ == "__main__":
+    target_allocation = pd.read_csv("data/01_raw/client_target_allocations.csv")
+    client_allocation = pd.read_csv("data/01_raw/financial_advisor_clients.csv")
 
-client_allocation, asset_performance = normalize_client_allocation(client_allocation)
-target_allocation, client_profile = normalize_target_allocation(target_allocation)
+    client_allocation, asset_performance = normalize_client_allocation(
+        client_allocation, processes=get_transform_processes()
+    )
+    target_allocation, client_profile = normalize_target_allocation(target_allocation)
 
-delete_existing_data()
+    delete_existing_data()
 
-load_data(client_profile, ClientProfile)
-load_data(asset_performance, AssetPerformance)
-load_data(client_allocation, ClientAllocation)
-load_data(target_allocation, TargetAllocation)
+    load_data(client_profile, ClientProfile)
+    load_data(asset_performance, AssetPerformance)
+    load_data(client_allocation, ClientAllocation)
+    load_data(target_allocation, TargetAllocation)
+
+    print(f"Pool metrics: {get_pool_metrics(get_engine())}")
@@ -0,0 +1,157 @@
+from financialgpt.data.connection import (
+    DatabaseSettings,
+    create_database_engine,
+    get_connect_args,
+    get_pool_metrics,
+    set_role,
+)
+from sqlalchemy import text
+from unittest.mock import MagicMock
+import pytest
+
+
+def test_settings_from_env(monkeypatch: pytest.MonkeyPatch) -> None:
+    """
+    Test that the database settings are read from the environment.
+
+    Args:
+        monkeypatch (pytest.MonkeyPatch): The pytest monkeypatch fixture.
+    """
+    monkeypatch.setenv("DATABASE_URL", "postgresql+psycopg2://loader@db:5432/DB")
+    monkeypatch.delenv("DATABASE_AGENT_URL", raising=False)
+    monkeypatch.setenv("DATABASE_AGENT_ROLE", "financialgpt_reader")
+    monkeypatch.setenv("DATABASE_AGENT_STATEMENT_TIMEOUT_MS", "5000")
+    monkeypatch.setenv("DATABASE_POOL_SIZE", "20")
+    monkeypatch.setenv("DATABASE_POOL_PRE_PING", "false")
+
+    settings = DatabaseSettings.from_env()
+
+    assert settings.url == "postgresql+psycopg2://loader@db:5432/DB"
+    assert settings.agent_url == settings.url
+    assert settings.agent_role == "financialgpt_reader"
+    assert settings.agent_statement_timeout_ms == 5000
+    assert settings.pool_size == 20
+    assert not settings.pool_pre_ping
+
+
+def test_connect_args() -> None:
+    """
+    Test that only the agent connections get the statement timeout and read-only options.
+    """
+    settings = DatabaseSettings(agent_statement_timeout_ms=5000)
+
+    load_args = get_connect_args(settings, settings.url)
+    agent_args = get_connect_args(settings, settings.agent_url, read_only=True)
+
+    assert load_args["keepalives"] == 1
+    assert "options" not in load_args
+    assert "statement_timeout=5000" in agent_args["options"]
+    assert "default_transaction_read_only=on" in agent_args["options"]
+    assert get_connect_args(settings, "sqlite:///db.sqlite", read_only=True) == {}
+
+
+@pytest.fixture
+def dbapi_connection() -> MagicMock:
+    """
+    Fixture to build a mocked DBAPI connection that records whether autocommit was on
+    when each statement was executed.
+
+    Returns:
+        MagicMock: The mocked DBAPI connection.
+    """
+    dbapi_connection = MagicMock()
+    dbapi_connection.autocommit = False
+    dbapi_connection.autocommit_on_execute = []
+    cursor = dbapi_connection.cursor.return_value
+    cursor.__enter__.return_value = cursor
+    cursor.execute.side_effect = lambda statement: (
+        dbapi_connection.autocommit_on_execute.append(dbapi_connection.autocommit)
+    )
+    return dbapi_connection
+
+
+def test_set_role_outside_transaction(dbapi_connection: MagicMock) -> None:
+    """
+    Test that the agent role is set in autocommit mode, so the rollback done when the
+    connection returns to the pool does not undo it.
+
+    Args:
+        dbapi_connection (MagicMock): The mocked DBAPI connection.
+    """
+    set_role(dbapi_connection, '"financialgpt_reader"')
+
+    cursor = dbapi_connection.cursor.return_value
+    cursor.execute.assert_called_once_with('SET ROLE "financialgpt_reader"')
+    cursor.__exit__.assert_called_once()
+    assert dbapi_connection.autocommit_on_execute == [True]
+    assert dbapi_connection.autocommit is False
+    dbapi_connection.commit.assert_not_called()
+    dbapi_connection.rollback.assert_not_called()
+
+
+def test_set_role_failure(dbapi_connection: MagicMock) -> None:
+    """
+    Test that the cursor is closed and autocommit is restored when the role cannot be set.
+
+    Args:
+        dbapi_connection (MagicMock): The mocked DBAPI connection.
+    """
+    cursor = dbapi_connection.cursor.return_value
+    cursor.execute.side_effect = RuntimeError('role "missing" does not exist')
+
+    with pytest.raises(RuntimeError):
+        set_role(dbapi_connection, '"missing"')
+
+    cursor.__exit__.assert_called_once()
+    assert dbapi_connection.autocommit is False
+
+
+def test_agent_url_defaults_to_url() -> None:
+    """
+    Test that the agent URL defaults to the URL used to load data.
+    """
+    settings = DatabaseSettings(url="sqlite:///db.sqlite")
+    agent_settings = DatabaseSettings(
+        url="sqlite:///db.sqlite", agent_url="sqlite:///agent.sqlite"
+    )
+
+    assert settings.agent_url == "sqlite:///db.sqlite"
+    assert agent_settings.agent_url == "sqlite:///agent.sqlite"
+
+
+def test_in_memory_engine() -> None:
+    """
+    Test that an in-memory SQLite engine, which does not use a queue pool, can be created.
+    """
+    engine = create_database_engine(DatabaseSettings(url="sqlite://"))
+
+    with engine.connect() as connection:
+        assert connection.execute(text("SELECT 1")).scalar() == 1
+
+    assert get_pool_metrics(engine)["utilization"] is None
+
+
+def test_pool_metrics(tmp_path) -> None:
+    """
+    Test the pool utilization metrics of an engine.
+
+    Args:
+        tmp_path (Path): The pytest temporary directory.
+    """
+    url = f"sqlite:///{tmp_path / 'db.sqlite'}"
+    settings = DatabaseSettings(url=url, pool_size=2, max_overflow=2)
+    unlimited = DatabaseSettings(url=url, pool_size=2, max_overflow=-1)
+    engine = create_database_engine(settings)
+    unlimited_engine = create_database_engine(unlimited)
+
+    with engine.connect() as connection, unlimited_engine.connect() as other:
+        connection.execute(text("SELECT 1"))
+        other.execute(text("SELECT 1"))
+        metrics = get_pool_metrics(engine)
+        unlimited_metrics = get_pool_metrics(unlimited_engine)
+
+    assert metrics["checked_out"] == 1
+    assert metrics["utilization"] == 0.25
+    assert unlimited_metrics["checked_out"] == 1
+    assert unlimited_metrics["utilization"] is None
+    assert get_pool_metrics(engine)["checked_out"] == 0
@@ -4,6 +4,7 @@ from financialgpt.data.transform import (
     normalize_client_allocation,
 )
 from pandas import DataFrame
+import numpy as np
 import pandas as pd
 import pytest
 
@@ -102,6 +103,119 @@ def test_normalized_asset_performance(client_allocation: DataFrame) -> None:
     assert not asset_performance.duplicated().any()
 
 
+def test_normalized_client_allocation_parallel(client_allocation: DataFrame) -> None:
+    """
+    Test that the parallel client_allocation normalization matches the serial one.
+
+    Args:
+        client_allocation (DataFrame): The sample client allocation DataFrame.
+    """
+    expected_client_allocation, expected_asset_performance = (
+        normalize_client_allocation(client_allocation.copy())
+    )
+    client_allocation, asset_performance = normalize_client_allocation(
+        client_allocation, processes=4
+    )
+
+    pd.testing.assert_frame_equal(client_allocation, expected_client_allocation)
+    pd.testing.assert_frame_equal(asset_performance, expected_asset_performance)
+
+
+@pytest.fixture
+def interleaved_client_allocation() -> DataFrame:
+    """
+    Fixture to build a small client allocation DataFrame where clients alternate between
+    rows, with a duplicated asset and NA values to fill.
+
+    Returns:
+        DataFrame: A small client allocation DataFrame.
+    """
+    return pd.DataFrame(
+        {
+            "Client": ["Client_1", "Client_2", "Client_1", "Client_2", "Client_1"],
+            "Symbol": ["AAPL", np.nan, "MSFT", "AAPL", "AAPL"],
+            "Name": [
+                "Apple Inc.",
+                "Microsoft Corp.",
+                "Microsoft Corp.",
+                np.nan,
+                np.nan,
+            ],
+            "Sector": ["Technology", np.nan, "Technology", np.nan, np.nan],
+            "Quantity": [10.0, np.nan, 5.0, 2.0, 1.0],
+            "Buy Price": [100.0, 200.0, np.nan, 110.0, 120.0],
+            "Current Price": [150.0, 300.0, 310.0, np.nan, 150.0],
+            "Market Value": [1500.0, 900.0, 1550.0, 300.0, np.nan],
+            "Purchase Date": ["01/02/21", np.nan, "03/04/21", "05/06/21", "07/08/21"],
+            "Dividend Yield": [0.5, 0.8, 0.8, 0.5, 0.5],
+            "P/E Ratio": [30.0, 35.0, 35.0, 30.0, 30.0],
+            "52-Week High": [180.0, 350.0, 350.0, 180.0, 180.0],
+            "52-Week Low": [120.0, 250.0, 250.0, 120.0, 120.0],
+            "Analyst Rating": ["Buy", "Hold", "Hold", "Buy", "Buy"],
+            "Target Price": [170.0, 330.0, 330.0, 170.0, 170.0],
+            "Risk Level": ["Medium", "Low", "Low", "Medium", "Medium"],
+        },
+        index=[10, 3, 7, 1, 5],
+    )
+
+
+def test_normalized_client_allocation_parallel_interleaved_clients(
+    interleaved_client_allocation: DataFrame,
+) -> None:
+    """
+    Test the parallel normalization with clients alternating between rows and more
+    processes than clients, so some shards have no rows.
+
+    Args:
+        interleaved_client_allocation (DataFrame): The small client allocation DataFrame.
+    """
+    expected_client_allocation, expected_asset_performance = (
+        normalize_client_allocation(interleaved_client_allocation.copy())
+    )
+    client_allocation, asset_performance = normalize_client_allocation(
+        interleaved_client_allocation, processes=4
+    )
+
+    assert client_allocation.index.tolist() == [10, 3, 7, 1]
+    assert client_allocation["symbol"].tolist() == ["AAPL", "MSFT", "MSFT", "AAPL"]
+    assert asset_performance.index.tolist() == [10, 3]
+    assert (
+        client_allocation.dtypes.to_dict()
+        == expected_client_allocation.dtypes.to_dict()
+    )
+    assert (
+        asset_performance.dtypes.to_dict()
+        == expected_asset_performance.dtypes.to_dict()
+    )
+    pd.testing.assert_frame_equal(client_allocation, expected_client_allocation)
+    pd.testing.assert_frame_equal(asset_performance, expected_asset_performance)
+
+
+@pytest.mark.parametrize("rows", [0, 1])
+def test_normalized_client_allocation_parallel_without_shards(
+    interleaved_client_allocation: DataFrame, rows: int
+) -> None:
+    """
+    Test the parallel normalization of a book without rows or with a single client, which
+    falls back to the serial path.
+
+    Args:
+        interleaved_client_allocation (DataFrame): The small client allocation DataFrame.
+        rows (int): The number of rows to keep.
+    """
+    book = interleaved_client_allocation.iloc[:rows]
+    expected_client_allocation, expected_asset_performance = (
+        normalize_client_allocation(book.copy())
+    )
+    client_allocation, asset_performance = normalize_client_allocation(
+        book.copy(), processes=4
+    )
+
+    assert len(client_allocation) == rows
+    pd.testing.assert_frame_equal(client_allocation, expected_client_allocation)
+    pd.testing.assert_frame_equal(asset_performance, expected_asset_performance)
+
+
 def test_normalized_target_allocation(target_allocation: DataFrame) -> None:
     """
     Test the normalized target_allocation.